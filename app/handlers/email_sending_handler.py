@@ -9,8 +9,8 @@ import base64
 import os
 load_dotenv()
 class EmailSendingHandler:
-    def __init__(self) -> None:
-        self.LARK_PROCESSOR = LarkBaseRecords()
+    def __init__(self, app_token: str = None, table_id: str = None) -> None:
+        self.LARK_PROCESSOR = LarkBaseRecords(app_token=app_token, table_id=table_id)
         self.OKPO_PROCESSOR = OkpoService()
         self.sendgrid_api_key = os.getenv("SENDGRID_API_KEY")
         self.sender_email = os.getenv("SENDGRID_SENDER_EMAIL")
@@ -1,7 +1,47 @@
+import argparse
 from lark_oapi.api.bitable.v1 import *
-from app.services import LarkRecordProcessor
+from app.services import LarkRecordProcessor, LarkBackfillRunner
+from app.services.lark_backfill import DEFAULT_BACKFILL_FILTER
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Lark Record Processor")
+    subparsers = parser.add_subparsers(dest="command")
+
+    poll = subparsers.add_parser("poll", help="Continuously poll for new unprocessed records (default)")
+    poll.add_argument("--interval", type=int, default=5, help="Polling interval in seconds")
+
+    backfill = subparsers.add_parser("backfill", help="Process every matching record once and exit")
+    backfill.add_argument("--table-id", help="Table to backfill (defaults to LARK_TABLE_ID)")
+    backfill.add_argument("--app-token", help="BiTable app token (defaults to LARK_BITABLE_ID)")
+    backfill.add_argument("--ids-file", help="File of record IDs to process, one per line, instead of scanning the table")
+    backfill.add_argument("--filter", default=DEFAULT_BACKFILL_FILTER, help="Filter condition used when scanning the table")
+    backfill.add_argument("--concurrency", type=int, default=8, help="Number of records processed in parallel")
+    backfill.add_argument("--checkpoint", help="Checkpoint file used to resume an interrupted run")
+    backfill.add_argument("--retry-failed", action="store_true", help="Re-run records the checkpoint marks as failed")
+    backfill.add_argument("--dry-run", action="store_true", help="List matching records without sending emails")
+
+    return parser.parse_args()
+
+def run_backfill(args):
+    runner = LarkBackfillRunner(
+        app_token=args.app_token,
+        table_id=args.table_id,
+        concurrency=args.concurrency,
+        dry_run=args.dry_run,
+        checkpoint_path=args.checkpoint,
+        retry_failed=args.retry_failed
+    )
+
+    record_ids = LarkBackfillRunner.read_record_ids(args.ids_file) if args.ids_file else None
+    runner.run(record_ids=record_ids, filter_condition=args.filter)
 
 def main():
+    args = parse_args()
+
+    if args.command == "backfill":
+        run_backfill(args)
+        return
+
     # Initialize the processor
     processor = LarkRecordProcessor()
     
@@ -9,7 +49,7 @@ def main():
     print("Press Ctrl+C to stop")
     
     # Option 1: Run with continuous polling (recommended)
-    processor.run_with_continuous_polling(interval=5)
+    processor.run_with_continuous_polling(interval=getattr(args, "interval", 5))
     
     # Option 2: Manual control (alternative approach)
     # processor.start_continuous_polling(app_token, table_id, interval=5)
@@ -21,12 +61,8 @@ def main():
     # except KeyboardInterrupt:
     #     processor.stop_continuous_polling()
     
-    # Option 3: One-time processing (for testing)
-    # success = processor.fetch_unprocessed_records(app_token, table_id)
-    # if success:
-    #     processor.process_all_records(app_token, table_id)
-    # else:
-    #     print("Failed to fetch records")
+    # Option 3: One-time processing of every matching record
+    # python -m app.main backfill --concurrency 8 [--ids-file ids.txt] [--dry-run]
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
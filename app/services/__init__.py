@@ -1,3 +1,4 @@
 from .lark_base_records import LarkBaseRecords
 from .okpo_service import OkpoService
-from .lark_processor import LarkRecordProcessor
\ No newline at end of file
+from .lark_processor import LarkRecordProcessor
+from .lark_backfill import LarkBackfillRunner
\ No newline at end of file
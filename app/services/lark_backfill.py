@@ -0,0 +1,327 @@
+import json
+import lark_oapi as lark
+from lark_oapi.api.bitable.v1 import *
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from app.handlers import EmailSendingHandler
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Unlike the polling filter, this does not exclude processed records: the
+# backfill marks records as "Processed" while it pages through them, and
+# filtering on that field would shift the page_token cursor mid-run.
+# Already-processed records are skipped client-side instead.
+DEFAULT_BACKFILL_FILTER = 'CurrentValue.[Label].contains("Willing to Pay", "Willing To Pay")'
+
+MAX_LIST_PAGE_SIZE = 500
+MAX_BATCH_GET_SIZE = 100
+
+
+class LarkBackfillRunner:
+    def __init__(self, app_token: str = None, table_id: str = None, concurrency: int = 8,
+                 dry_run: bool = False, checkpoint_path: str = None, retry_failed: bool = False,
+                 log_level=lark.LogLevel.INFO):
+        """
+        Initialize the one-shot backfill runner
+
+        Args:
+            app_token: BiTable app token (defaults to LARK_BITABLE_ID)
+            table_id: Table to backfill (defaults to LARK_TABLE_ID)
+            concurrency: Number of records processed in parallel
+            dry_run: List matching records without sending emails or writing the checkpoint
+            checkpoint_path: JSON-lines file recording finished record IDs, used to resume
+            retry_failed: Re-run records the checkpoint marks as failed
+            log_level: Logging level for the client
+        """
+        self.app_token = app_token or os.getenv("LARK_BITABLE_ID")
+        self.table_id = table_id or os.getenv("LARK_TABLE_ID")
+        self.app_id = os.getenv("LARK_APP_ID")
+        self.app_secret = os.getenv("LARK_APP_SECRET")
+        self.concurrency = max(1, concurrency)
+        self.dry_run = dry_run
+        self.checkpoint_path = checkpoint_path or f".backfill_{self.table_id}.jsonl"
+        self.retry_failed = retry_failed
+
+        self.stop_event = threading.Event()
+        self.checkpoint_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self._local = threading.local()
+
+        self.client = lark.Client.builder() \
+            .app_id(self.app_id) \
+            .app_secret(self.app_secret) \
+            .log_level(log_level) \
+            .build()
+
+    def iter_table_records(self, filter_condition: str = DEFAULT_BACKFILL_FILTER,
+                           page_size: int = MAX_LIST_PAGE_SIZE):
+        """
+        Stream every record matching the filter, one page at a time
+
+        Args:
+            filter_condition: Filter condition for the records
+            page_size: Number of records per page (capped at 500)
+
+        Yields:
+            AppTableRecord: Each matching record
+        """
+        page_token = None
+        while not self.stop_event.is_set():
+            builder = ListAppTableRecordRequest.builder() \
+                .app_token(self.app_token) \
+                .table_id(self.table_id) \
+                .page_size(min(page_size, MAX_LIST_PAGE_SIZE))
+            if filter_condition:
+                builder = builder.filter(filter_condition)
+            if page_token:
+                builder = builder.page_token(page_token)
+
+            response: ListAppTableRecordResponse = self.client.bitable.v1.app_table_record.list(builder.build())
+
+            if not response.success():
+                raise Exception(
+                    f"client.bitable.v1.app_table_record.list failed, code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}")
+
+            for record in response.data.items or []:
+                yield record
+
+            if not response.data.has_more:
+                break
+            page_token = response.data.page_token
+
+    def iter_records_by_id(self, record_ids: List[str]):
+        """
+        Stream records for an explicit list of record IDs, fetched in batches
+
+        Args:
+            record_ids: IDs of the records to fetch
+
+        Yields:
+            AppTableRecord: Each record that exists and is readable
+        """
+        for start in range(0, len(record_ids), MAX_BATCH_GET_SIZE):
+            if self.stop_event.is_set():
+                break
+            request = BatchGetAppTableRecordRequest.builder() \
+                .app_token(self.app_token) \
+                .table_id(self.table_id) \
+                .request_body(BatchGetAppTableRecordRequestBody.builder()
+                    .record_ids(record_ids[start:start + MAX_BATCH_GET_SIZE])
+                    .build()) \
+                .build()
+
+            response: BatchGetAppTableRecordResponse = self.client.bitable.v1.app_table_record.batch_get(request)
+
+            if not response.success():
+                raise Exception(
+                    f"client.bitable.v1.app_table_record.batch_get failed, code: {response.code}, msg: {response.msg}, log_id: {response.get_log_id()}")
+
+            missing = (response.data.absent_record_ids or []) + (response.data.forbidden_record_ids or [])
+            if missing:
+                lark.logger.warning(f"Skipping {len(missing)} absent or forbidden records: {missing}")
+
+            for record in response.data.records or []:
+                yield record
+
+    @staticmethod
+    def read_record_ids(path: str) -> List[str]:
+        """
+        Read record IDs from a file, one per line (blank lines and # comments ignored)
+
+        Args:
+            path: Path to the file of record IDs
+
+        Returns:
+            List[str]: Record IDs in file order, without duplicates
+        """
+        record_ids = []
+        seen = set()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                record_id = line.split("#", 1)[0].strip()
+                if record_id and record_id not in seen:
+                    seen.add(record_id)
+                    record_ids.append(record_id)
+        return record_ids
+
+    def load_checkpoint(self) -> Dict[str, str]:
+        """
+        Load finished record IDs from the checkpoint file
+
+        Returns:
+            dict: Mapping of record ID to its last recorded status
+        """
+        finished = {}
+        if not os.path.exists(self.checkpoint_path):
+            return finished
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A partially written last line from an interrupted run
+                    continue
+                finished[entry["record_id"]] = entry["status"]
+        return finished
+
+    def _write_checkpoint(self, record_id: str, status: str) -> None:
+        with self.checkpoint_lock:
+            self._checkpoint_file.write(json.dumps({"record_id": record_id, "status": status}) + "\n")
+            self._checkpoint_file.flush()
+
+    def _get_handler(self) -> EmailSendingHandler:
+        # One handler per worker thread, reused across records
+        handler = getattr(self._local, "handler", None)
+        if handler is None:
+            handler = EmailSendingHandler(app_token=self.app_token, table_id=self.table_id)
+            self._local.handler = handler
+        return handler
+
+    def _process(self, record) -> None:
+        started = time.monotonic()
+        try:
+            success = self._get_handler().handler(payload=record)
+        except Exception as e:
+            lark.logger.error(f"Error processing record {record.record_id}: {str(e)}")
+            success = False
+        latency = time.monotonic() - started
+
+        status = "processed" if success else "failed"
+        self._write_checkpoint(record.record_id, status)
+        with self.stats_lock:
+            self.stats[status] += 1
+            self.latencies.append(latency)
+
+    def _should_skip(self, record, finished: Dict[str, str]) -> bool:
+        status = finished.get(record.record_id)
+        if status == "processed" or (status == "failed" and not self.retry_failed):
+            return True
+        return (record.fields or {}).get("processed_status") == "Processed"
+
+    def run(self, record_ids: List[str] = None, filter_condition: str = DEFAULT_BACKFILL_FILTER) -> dict:
+        """
+        Process every matching record once, in parallel, then print a summary
+
+        Args:
+            record_ids: Explicit record IDs to process; the whole table is scanned when omitted
+            filter_condition: Filter condition used when scanning the table
+
+        Returns:
+            dict: Run summary with counts, throughput and latency figures
+        """
+        finished = self.load_checkpoint()
+        if finished:
+            print(f"Resuming from checkpoint {self.checkpoint_path}: {len(finished)} records already handled")
+
+        if record_ids is not None:
+            records = self.iter_records_by_id(record_ids)
+        else:
+            records = self.iter_table_records(filter_condition)
+
+        self.stats = {"seen": 0, "skipped": 0, "processed": 0, "failed": 0}
+        self.latencies = []
+        started = time.monotonic()
+
+        mode = "DRY RUN" if self.dry_run else f"concurrency={self.concurrency}"
+        print(f"Starting backfill of table {self.table_id} ({mode})...")
+
+        try:
+            if self.dry_run:
+                for record in records:
+                    self.stats["seen"] += 1
+                    if self._should_skip(record, finished):
+                        self.stats["skipped"] += 1
+                    else:
+                        print(f"Would process record ID: {record.record_id}")
+                        self.stats["processed"] += 1
+            else:
+                self._run_concurrently(records, finished)
+        except KeyboardInterrupt:
+            self.stop_event.set()
+            print("\nReceived interrupt signal. Progress is checkpointed; re-run to resume.")
+
+        summary = self._summarize(time.monotonic() - started)
+        self.print_summary(summary)
+        return summary
+
+    def _run_concurrently(self, records, finished: Dict[str, str]) -> None:
+        # Keep a bounded number of records in flight so pages are fetched
+        # only as fast as workers drain them
+        max_in_flight = self.concurrency * 2
+        in_flight = set()
+        last_reported = 0
+
+        with open(self.checkpoint_path, "a", encoding="utf-8") as self._checkpoint_file, \
+                ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            try:
+                for record in records:
+                    self.stats["seen"] += 1
+                    if self._should_skip(record, finished):
+                        self.stats["skipped"] += 1
+                        continue
+
+                    if len(in_flight) >= max_in_flight:
+                        _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    in_flight.add(executor.submit(self._process, record))
+
+                    with self.stats_lock:
+                        done = self.stats["processed"] + self.stats["failed"]
+                    if done - last_reported >= 100:
+                        last_reported = done
+                        print(f"Progress: {done} records done, {self.stats['skipped']} skipped")
+            except KeyboardInterrupt:
+                # Drop queued records but let running ones finish so their
+                # outcome is checkpointed
+                self.stop_event.set()
+                for future in in_flight:
+                    future.cancel()
+                raise
+            finally:
+                wait(in_flight)
+
+    def _summarize(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        done = self.stats["processed"] + self.stats["failed"]
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            **self.stats,
+            "dry_run": self.dry_run,
+            "interrupted": self.stop_event.is_set(),
+            "elapsed_seconds": elapsed,
+            "records_per_second": done / elapsed if elapsed > 0 else 0.0,
+            "latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+    @staticmethod
+    def print_summary(summary: dict) -> None:
+        """
+        Print the throughput/latency summary of a run
+
+        Args:
+            summary: Summary returned by run()
+        """
+        print("\nBackfill summary" + (" (dry run)" if summary["dry_run"] else "")
+              + (" (interrupted)" if summary["interrupted"] else ""))
+        print(f"  Records seen:      {summary['seen']}")
+        print(f"  Skipped:           {summary['skipped']}")
+        if summary["dry_run"]:
+            print(f"  Would process:     {summary['processed']}")
+        else:
+            print(f"  Processed:         {summary['processed']}")
+            print(f"  Failed:            {summary['failed']}")
+        print(f"  Elapsed:           {summary['elapsed_seconds']:.1f}s")
+        if not summary["dry_run"]:
+            print(f"  Throughput:        {summary['records_per_second']:.2f} records/s")
+            print(f"  Latency avg/p50/p95/max: {summary['latency_avg']:.2f}s / {summary['latency_p50']:.2f}s"
+                  f" / {summary['latency_p95']:.2f}s / {summary['latency_max']:.2f}s")
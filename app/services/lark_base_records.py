@@ -6,9 +6,9 @@ import os
 load_dotenv()
 
 class LarkBaseRecords: 
-    def __init__(self) -> None:
-        self.app_token = os.getenv("LARK_BITABLE_ID")
-        self.table_id = os.getenv("LARK_TABLE_ID")
+    def __init__(self, app_token: str = None, table_id: str = None) -> None:
+        self.app_token = app_token or os.getenv("LARK_BITABLE_ID")
+        self.table_id = table_id or os.getenv("LARK_TABLE_ID")
         self.app_id = os.getenv("LARK_APP_ID")
         self.app_secret = os.getenv("LARK_APP_SECRET")
         